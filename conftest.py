@@ -0,0 +1 @@
+# 让测试可以直接导入项目根目录下的 functions 等模块
@@ -10,6 +10,9 @@ from bs4 import BeautifulSoup
 import requests
 from tqdm import tqdm
 
+# 索引中的视频标签超过这个时间（秒）后会重新请求页面，以跟上UP主对标签的修改
+TAG_REFRESH_SECONDS = 7 * 24 * 3600
+
 class BilibiliNetworkCapture:
     """Bilibili网络请求捕获类，用于监听和收集推荐视频的API响应"""
     
@@ -163,12 +166,16 @@ def parse_html_to_tag(html:str) -> list[str]:
     return tags
 
 
-def extract_text_from_json_responses(json_responses: List[str]) -> str:
+def extract_text_from_json_responses(json_responses: List[str], tag_index=None,
+                                     tag_max_age: float = TAG_REFRESH_SECONDS) -> str:
     """
     从JSON响应中提取文本内容
     
     Args:
         json_responses: JSON响应字符串列表
+        tag_index: TagIndex 实例（可选），提供时把每个视频的标签写入索引
+        tag_max_age: 复用索引标签的最长时间（秒），在此时间内索引过且标签非空的视频
+            直接复用索引中的标签而不再请求页面；为0时每个视频都重新请求
         
     Returns:
         str: 提取的所有文本内容
@@ -194,13 +201,29 @@ def extract_text_from_json_responses(json_responses: List[str]) -> str:
             print(f"提取文本时出错: {e}")
             continue
     # 访问推荐的视频链接，获取它的标签
+    seen_ts = time.time()
     for url in tqdm(all_urls):
+        if tag_index is not None and tag_max_age > 0:
+            # 只复用近期且非空的标签；空标签可能来自风控或空页面，需要重新请求
+            try:
+                cached_tags = tag_index.get_fresh_tags(url, tag_max_age, seen_ts)
+                if cached_tags:
+                    tag_index.record_sighting(url, seen_ts)
+                    all_text += cached_tags
+                    continue
+            except Exception as e:
+                print(f"读取标签索引时出错: {e}")
         headers = {
             'referer': 'https://www.bilibili.com',
             'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36 Edg/135.0.0.0'
                 }
         response = requests.get(url,headers=headers)
         tags = parse_html_to_tag(response.text)
+        if tag_index is not None:
+            try:
+                tag_index.add_video(url, tags, seen_ts)
+            except Exception as e:
+                print(f"写入标签索引时出错: {e}")
         all_text += tags
         time.sleep(0.3)
 
@@ -211,15 +234,15 @@ def extract_text_from_json_responses(json_responses: List[str]) -> str:
     return combined_text
 
 
-def preprocess_text(text: str) -> str:
+def tokenize_text(text: str) -> List[str]:
     """
-    预处理文本，进行分词和清理
+    对文本进行分词，并过滤掉单字、纯数字、标点和停用词
     
     Args:
         text: 原始文本
         
     Returns:
-        str: 处理后的文本
+        List[str]: 过滤后的词列表（保留原有顺序和重复）
     """
     # 使用jieba进行中文分词
     words = jieba.cut(text)
@@ -235,6 +258,34 @@ def preprocess_text(text: str) -> str:
             word not in ['的', '了', '在', '是', '有', '和', '就', '不', '到', '说', '要', '去', '你', '会', '着', '没有', '看', '好', '还', '把', '那', '这', '来', '很', '从', '被', '让', '给', '对', '向', '以', '所', '为', '而', '也', '都', '能', '下', '自己', '什么', '怎么', '可以', '如果', '因为', '所以', '但是', '然后', '现在', '已经', '一个', '这个', '那个', '我们', '他们', '她们', '它们']):
             filtered_words.append(word)
     
+    return filtered_words
+
+
+def count_words(text: str) -> Counter:
+    """
+    统计文本分词后的词频（未经 preprocess_text 的去重）
+    
+    Args:
+        text: 原始文本
+        
+    Returns:
+        Counter: {词: 出现次数}
+    """
+    return Counter(tokenize_text(text))
+
+
+def preprocess_text(text: str) -> str:
+    """
+    预处理文本，进行分词和清理
+    
+    Args:
+        text: 原始文本
+        
+    Returns:
+        str: 处理后的文本
+    """
+    filtered_words = tokenize_text(text)
+    
     # 统计词频，只保留出现频率较高的词
     word_freq = Counter(filtered_words)
     # 只保留出现次数大于1的词，或者总词数少于100时保留所有词
@@ -0,0 +1,227 @@
+# 词频持久化存储，用于跨多次运行追踪推荐标签的变化趋势
+import os
+import sqlite3
+import time
+from typing import Dict, Optional
+
+# 滚动窗口定义：窗口名 -> 时间跨度（秒），None 表示全部历史
+DEFAULT_WINDOWS = {
+    'day': 24 * 3600,
+    'week': 7 * 24 * 3600,
+    'month': 30 * 24 * 3600,
+    'all': None,
+}
+
+
+def get_default_db_path() -> str:
+    """获取默认的词频数据库路径（项目根目录下的data目录）"""
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+    return os.path.join(data_dir, 'word_freq.db')
+
+
+class WordFrequencyStore:
+    """
+    基于SQLite的滚动词频存储
+
+    每次运行的词频作为一个带时间戳的增量写入 run_words 表，
+    同时增量维护各滚动窗口（日/周/月/全部）的聚合结果 window_counts。
+    每个增量只会被加入窗口一次、移出窗口一次，因此单次更新的代价
+    与本次涉及的词汇量成正比，而与历史运行次数无关。
+
+    run_words 中的原始增量会被有意保留，以便新增窗口时能从全部历史重建；
+    因此数据库文件大小随运行次数增长，但更新和查询不需要扫描全部历史。
+    """
+
+    def __init__(self, db_path: str = None, windows: Dict[str, Optional[int]] = None):
+        """
+        初始化词频存储
+
+        Args:
+            db_path: SQLite数据库文件路径（可选，默认 data/word_freq.db）
+            windows: 窗口名到时间跨度（秒）的映射（可选），已登记的窗口名必须使用相同跨度
+
+        Raises:
+            ValueError: 某个窗口名已以不同的跨度登记在数据库中
+        """
+        self.db_path = db_path or get_default_db_path()
+        self.windows = dict(windows or DEFAULT_WINDOWS)
+        self.conn = sqlite3.connect(self.db_path)
+        self._create_tables()
+
+    def _create_tables(self):
+        """创建数据表并登记窗口"""
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS run_words (
+                run_id INTEGER NOT NULL,
+                word TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (run_id, word)
+            );
+            CREATE TABLE IF NOT EXISTS windows (
+                name TEXT PRIMARY KEY,
+                span REAL,
+                expired_run_id INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS window_counts (
+                window_name TEXT NOT NULL,
+                word TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (window_name, word)
+            );
+        """)
+        # 窗口定义由所有实例共享，同名窗口的跨度不允许被某个实例改写
+        for name, span in self.windows.items():
+            row = self.conn.execute("SELECT span FROM windows WHERE name = ?", (name,)).fetchone()
+            if row is not None and row[0] != span:
+                self.conn.close()
+                raise ValueError(f"窗口 {name} 已登记的跨度为 {row[0]}，与传入的 {span} 不一致")
+        for name, span in self.windows.items():
+            row = self.conn.execute("SELECT span FROM windows WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                # 新窗口：从已有历史中一次性重建
+                self.conn.execute("INSERT INTO windows (name, span) VALUES (?, ?)", (name, span))
+                self._rebuild_window(name, span)
+        self.conn.commit()
+
+    def _rebuild_window(self, name: str, span: Optional[float]):
+        """根据全部历史重新计算某个窗口的聚合（仅在窗口新建时使用）"""
+        self.conn.execute("DELETE FROM window_counts WHERE window_name = ?", (name,))
+        cutoff = float('-inf') if span is None else time.time() - span
+        expired = self.conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM runs WHERE ts < ?", (cutoff,)
+        ).fetchone()[0]
+        self.conn.execute("""
+            INSERT INTO window_counts (window_name, word, count)
+            SELECT ?, rw.word, SUM(rw.count)
+            FROM run_words rw WHERE rw.run_id > ?
+            GROUP BY rw.word
+        """, (name, expired))
+        self.conn.execute("UPDATE windows SET expired_run_id = ? WHERE name = ?", (expired, name))
+
+    def add_run(self, word_counts: Dict[str, int], ts: float = None) -> int:
+        """
+        写入一次运行的词频增量，并更新所有滚动窗口
+
+        Args:
+            word_counts: 本次运行的词频 {词: 次数}
+            ts: 运行时间戳（可选，默认当前时间），不能早于已记录的最后一次运行
+
+        Returns:
+            int: 本次运行的编号
+        """
+        ts = time.time() if ts is None else ts
+        # 时间戳随编号单调递增，最后一次运行即编号最大的一行
+        row = self.conn.execute("SELECT ts FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        if row is not None and ts < row[0]:
+            raise ValueError(f"运行时间戳 {ts} 早于最后一次记录的时间 {row[0]}")
+
+        items = [(word, int(count)) for word, count in word_counts.items() if count > 0]
+        with self.conn:
+            run_id = self.conn.execute("INSERT INTO runs (ts) VALUES (?)", (ts,)).lastrowid
+            self.conn.executemany(
+                "INSERT INTO run_words (run_id, word, count) VALUES (?, ?, ?)",
+                [(run_id, word, count) for word, count in items]
+            )
+            # 更新数据库中登记的全部窗口，而不只是本实例关心的窗口，
+            # 以免其他实例之后打开这些窗口时缺少中间的增量
+            names = [name for (name,) in self.conn.execute("SELECT name FROM windows")]
+            for name in names:
+                self.conn.executemany("""
+                    INSERT INTO window_counts (window_name, word, count) VALUES (?, ?, ?)
+                    ON CONFLICT (window_name, word) DO UPDATE SET count = count + excluded.count
+                """, [(name, word, count) for word, count in items])
+            self._expire(ts)
+        return run_id
+
+    def advance(self, now: float = None):
+        """在没有新数据的情况下推进时间，把过期的运行移出各窗口"""
+        with self.conn:
+            self._expire(time.time() if now is None else now)
+
+    def _expire(self, now: float):
+        """把时间戳落在窗口之外的运行从窗口聚合中减去"""
+        for name, span, expired_run_id in self.conn.execute(
+                "SELECT name, span, expired_run_id FROM windows").fetchall():
+            if span is None:
+                continue
+            # 时间戳随编号单调递增，待过期的运行总是紧接在游标之后的一段
+            row = self.conn.execute(
+                "SELECT MAX(id) FROM runs WHERE id > ? AND ts < ?",
+                (expired_run_id, now - span)
+            ).fetchone()
+            if row[0] is None:
+                continue
+            new_expired = row[0]
+            # 先一次性汇总过期运行的词频，再按 (窗口, 词) 主键逐条扣减
+            expired_counts = self.conn.execute("""
+                SELECT word, SUM(count) FROM run_words
+                WHERE run_id > ? AND run_id <= ?
+                GROUP BY word
+            """, (expired_run_id, new_expired)).fetchall()
+            self.conn.executemany(
+                "UPDATE window_counts SET count = count - ? WHERE window_name = ? AND word = ?",
+                [(count, name, word) for word, count in expired_counts]
+            )
+            self.conn.executemany(
+                "DELETE FROM window_counts WHERE window_name = ? AND word = ? AND count <= 0",
+                [(name, word) for word, _ in expired_counts]
+            )
+            self.conn.execute(
+                "UPDATE windows SET expired_run_id = ? WHERE name = ?", (new_expired, name))
+
+    def get_window(self, window: str) -> Dict[str, int]:
+        """
+        获取某个滚动窗口的词频
+
+        Args:
+            window: 窗口名，如 'day'、'week'、'month'、'all'
+
+        Returns:
+            Dict[str, int]: 窗口内的词频
+        """
+        if window not in self.windows:
+            raise KeyError(f"未知的窗口: {window}，可选: {', '.join(self.windows)}")
+        # 读取前先按当前时间把过期的运行移出窗口，避免长时间未采集时返回旧数据
+        self.advance()
+        rows = self.conn.execute(
+            "SELECT word, count FROM window_counts WHERE window_name = ?", (window,))
+        return {word: count for word, count in rows}
+
+    def diff_windows(self, window: str, base_window: str) -> Dict[str, float]:
+        """
+        计算两个窗口之间的词频变化
+
+        两个窗口的词频先各自归一化为占比，再相减，只保留占比上升的词，
+        结果可直接作为词云的权重（例如 'day' 相对 'month' 的新兴标签）。
+
+        Args:
+            window: 目标窗口名
+            base_window: 对比基准窗口名
+
+        Returns:
+            Dict[str, float]: 占比上升的词及其上升幅度
+        """
+        current = self.get_window(window)
+        base = self.get_window(base_window)
+        current_total = sum(current.values())
+        base_total = sum(base.values())
+        if not current_total:
+            return {}
+
+        diff = {}
+        for word, count in current.items():
+            share = count / current_total
+            base_share = base.get(word, 0) / base_total if base_total else 0.0
+            if share > base_share:
+                diff[word] = share - base_share
+        return diff
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
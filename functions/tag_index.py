@@ -0,0 +1,334 @@
+# 标签与视频的倒排索引，用于在不重新抓取页面的情况下查询已收集的数据
+import math
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 按日期范围统计时使用的时间桶大小（按UTC自然日分桶）
+BUCKET_SECONDS = 24 * 3600
+
+
+def get_default_index_path() -> str:
+    """获取默认的标签索引数据库路径（项目根目录下的data目录）"""
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+    return os.path.join(data_dir, 'tag_index.db')
+
+
+class TagIndex:
+    """
+    基于SQLite的 视频↔标签 索引
+
+    视频和标签都映射为紧凑的整数编号：
+    - 正排 video_tags (video_id, tag_id)：视频 -> 标签
+    - 倒排 tag_videos (tag_id, video_id)：标签 -> 按编号排序的视频列表
+
+    查询用的统计量在写入时增量维护，查询时不再对明细做连接聚合：
+    - tag_pairs (tag_id, other_id) -> n：两个标签共同出现的视频数
+    - video_days (video_id, day)：视频在某天是否已被看到，保证每个视频每天只计一次
+    - day_tag_counts (day, tag_id) -> n 与 tag_totals (tag_id) -> n：按天和全部历史的标签计数
+
+    所有表都是 WITHOUT ROWID 的聚簇B树，按标签、视频或日期查询只需一次范围扫描。
+    """
+
+    def __init__(self, db_path: str = None):
+        """
+        初始化标签索引
+
+        Args:
+            db_path: SQLite数据库文件路径（可选，默认 data/tag_index.db）
+        """
+        self.db_path = db_path or get_default_index_path()
+        self.conn = sqlite3.connect(self.db_path)
+        self._create_tables()
+
+    def _create_tables(self):
+        """创建数据表"""
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS videos (
+                id INTEGER PRIMARY KEY,
+                uri TEXT NOT NULL UNIQUE,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS video_tags (
+                video_id INTEGER NOT NULL,
+                tag_id INTEGER NOT NULL,
+                PRIMARY KEY (video_id, tag_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS tag_videos (
+                tag_id INTEGER NOT NULL,
+                video_id INTEGER NOT NULL,
+                PRIMARY KEY (tag_id, video_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS tag_pairs (
+                tag_id INTEGER NOT NULL,
+                other_id INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (tag_id, other_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS tag_pairs_by_count ON tag_pairs (tag_id, n);
+            CREATE TABLE IF NOT EXISTS video_days (
+                video_id INTEGER NOT NULL,
+                day INTEGER NOT NULL,
+                PRIMARY KEY (video_id, day)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS day_tag_counts (
+                day INTEGER NOT NULL,
+                tag_id INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (day, tag_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS tag_totals (
+                tag_id INTEGER PRIMARY KEY,
+                n INTEGER NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    def _get_tag_id(self, name: str) -> Optional[int]:
+        """获取标签编号，不存在时返回None"""
+        row = self.conn.execute("SELECT id FROM tags WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _get_or_create_tag_id(self, name: str) -> int:
+        """获取标签编号，不存在时分配新编号"""
+        tag_id = self._get_tag_id(name)
+        if tag_id is None:
+            tag_id = self.conn.execute("INSERT INTO tags (name) VALUES (?)", (name,)).lastrowid
+        return tag_id
+
+    def _get_video_id(self, uri: str) -> Optional[int]:
+        """获取视频编号，不存在时返回None"""
+        row = self.conn.execute("SELECT id FROM videos WHERE uri = ?", (uri,)).fetchone()
+        return row[0] if row else None
+
+    def _get_video_tag_ids(self, video_id: int) -> Set[int]:
+        """获取视频的标签编号集合"""
+        rows = self.conn.execute("SELECT tag_id FROM video_tags WHERE video_id = ?", (video_id,))
+        return {tag_id for (tag_id,) in rows}
+
+    def _update_pairs(self, old_tag_ids: Set[int], new_tag_ids: Set[int]):
+        """按视频新旧标签集合的差异调整共现计数"""
+        old_pairs = {(a, b) for a in old_tag_ids for b in old_tag_ids if a != b}
+        new_pairs = {(a, b) for a in new_tag_ids for b in new_tag_ids if a != b}
+        removed = old_pairs - new_pairs
+        self.conn.executemany("""
+            INSERT INTO tag_pairs (tag_id, other_id, n) VALUES (?, ?, 1)
+            ON CONFLICT (tag_id, other_id) DO UPDATE SET n = n + 1
+        """, new_pairs - old_pairs)
+        self.conn.executemany(
+            "UPDATE tag_pairs SET n = n - 1 WHERE tag_id = ? AND other_id = ?", removed)
+        self.conn.executemany(
+            "DELETE FROM tag_pairs WHERE tag_id = ? AND other_id = ? AND n <= 0", removed)
+
+    def _update_tag_counts(self, days: List[int], tag_ids: Iterable[int], delta: int):
+        """为若干天中的若干标签同时调整按天计数和总计数"""
+        tag_ids = list(tag_ids)
+        if not days or not tag_ids:
+            return
+        day_rows = [(day, tag_id, delta) for day in days for tag_id in tag_ids]
+        total_rows = [(tag_id, delta * len(days)) for tag_id in tag_ids]
+        self.conn.executemany("""
+            INSERT INTO day_tag_counts (day, tag_id, n) VALUES (?, ?, ?)
+            ON CONFLICT (day, tag_id) DO UPDATE SET n = n + excluded.n
+        """, day_rows)
+        self.conn.executemany("""
+            INSERT INTO tag_totals (tag_id, n) VALUES (?, ?)
+            ON CONFLICT (tag_id) DO UPDATE SET n = n + excluded.n
+        """, total_rows)
+        if delta < 0:
+            self.conn.executemany("DELETE FROM day_tag_counts WHERE day = ? AND tag_id = ? AND n <= 0",
+                                  [(day, tag_id) for day, tag_id, _ in day_rows])
+            self.conn.executemany("DELETE FROM tag_totals WHERE tag_id = ? AND n <= 0",
+                                  [(tag_id,) for tag_id in tag_ids])
+
+    def _record_day(self, video_id: int, tag_ids: Set[int], ts: float):
+        """记录视频在某天被看到；同一天内重复看到不会重复计数"""
+        day = int(ts // BUCKET_SECONDS)
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO video_days (video_id, day) VALUES (?, ?)", (video_id, day))
+        if cursor.rowcount == 1:
+            self._update_tag_counts([day], tag_ids, 1)
+
+    def has_video(self, uri: str) -> bool:
+        """判断视频是否已被索引"""
+        return self._get_video_id(uri) is not None
+
+    def add_video(self, uri: str, tags: List[str], ts: float = None) -> int:
+        """
+        索引一个视频及其标签，并记录一次看到该视频的时间
+
+        已索引的视频会用新的标签列表替换旧的标签，相关统计按新旧标签的差异调整。
+
+        Args:
+            uri: 视频链接
+            tags: 视频标签列表
+            ts: 看到视频的时间戳（可选，默认当前时间）
+
+        Returns:
+            int: 视频编号
+        """
+        ts = time.time() if ts is None else ts
+        with self.conn:
+            video_id = self._get_video_id(uri)
+            if video_id is None:
+                video_id = self.conn.execute("INSERT INTO videos (uri, indexed_at) VALUES (?, ?)",
+                                             (uri, ts)).lastrowid
+                old_tag_ids = set()
+            else:
+                self.conn.execute("UPDATE videos SET indexed_at = ? WHERE id = ?", (ts, video_id))
+                old_tag_ids = self._get_video_tag_ids(video_id)
+
+            new_tag_ids = {self._get_or_create_tag_id(tag) for tag in tags if tag}
+            removed = old_tag_ids - new_tag_ids
+            added = new_tag_ids - old_tag_ids
+            self.conn.executemany("DELETE FROM video_tags WHERE video_id = ? AND tag_id = ?",
+                                  [(video_id, tag_id) for tag_id in removed])
+            self.conn.executemany("DELETE FROM tag_videos WHERE tag_id = ? AND video_id = ?",
+                                  [(tag_id, video_id) for tag_id in removed])
+            self.conn.executemany("INSERT INTO video_tags (video_id, tag_id) VALUES (?, ?)",
+                                  [(video_id, tag_id) for tag_id in added])
+            self.conn.executemany("INSERT INTO tag_videos (tag_id, video_id) VALUES (?, ?)",
+                                  [(tag_id, video_id) for tag_id in added])
+            self._update_pairs(old_tag_ids, new_tag_ids)
+
+            # 之前看到该视频的每一天都要按标签差异修正
+            days = [day for (day,) in self.conn.execute(
+                "SELECT day FROM video_days WHERE video_id = ?", (video_id,))]
+            self._update_tag_counts(days, removed, -1)
+            self._update_tag_counts(days, added, 1)
+            self._record_day(video_id, new_tag_ids, ts)
+        return video_id
+
+    def record_sighting(self, uri: str, ts: float = None) -> bool:
+        """
+        为已索引的视频记录一次看到的时间，无需重新获取标签
+
+        Args:
+            uri: 视频链接
+            ts: 看到视频的时间戳（可选，默认当前时间）
+
+        Returns:
+            bool: 视频是否已被索引
+        """
+        video_id = self._get_video_id(uri)
+        if video_id is None:
+            return False
+        with self.conn:
+            self._record_day(video_id, self._get_video_tag_ids(video_id),
+                             time.time() if ts is None else ts)
+        return True
+
+    def get_tags(self, uri: str) -> List[str]:
+        """获取视频的标签列表"""
+        rows = self.conn.execute("""
+            SELECT t.name FROM videos v
+            JOIN video_tags vt ON vt.video_id = v.id
+            JOIN tags t ON t.id = vt.tag_id
+            WHERE v.uri = ?
+        """, (uri,))
+        return [name for (name,) in rows]
+
+    def get_fresh_tags(self, uri: str, max_age: float, now: float = None) -> List[str]:
+        """
+        获取在 max_age 秒内被索引过的视频标签
+
+        Args:
+            uri: 视频链接
+            max_age: 允许的最长索引时间（秒）
+            now: 当前时间戳（可选，默认当前时间）
+
+        Returns:
+            List[str]: 标签列表；视频未被索引或索引已过期时返回空列表
+        """
+        now = time.time() if now is None else now
+        rows = self.conn.execute("""
+            SELECT t.name FROM videos v
+            JOIN video_tags vt ON vt.video_id = v.id
+            JOIN tags t ON t.id = vt.tag_id
+            WHERE v.uri = ? AND v.indexed_at >= ?
+        """, (uri, now - max_age))
+        return [name for (name,) in rows]
+
+    def videos_with_tag(self, tag: str) -> List[str]:
+        """
+        查询带有某个标签的所有视频
+
+        Args:
+            tag: 标签名
+
+        Returns:
+            List[str]: 视频链接列表
+        """
+        rows = self.conn.execute("""
+            SELECT v.uri FROM tags t
+            JOIN tag_videos tv ON tv.tag_id = t.id
+            JOIN videos v ON v.id = tv.video_id
+            WHERE t.name = ?
+        """, (tag,))
+        return [uri for (uri,) in rows]
+
+    def co_occurring_tags(self, tag: str, top_n: int = 20) -> List[Tuple[str, int]]:
+        """
+        查询与某个标签共同出现次数最多的标签
+
+        Args:
+            tag: 标签名
+            top_n: 返回的标签数量
+
+        Returns:
+            List[Tuple[str, int]]: (标签, 共同出现的视频数) 列表，按次数降序
+        """
+        rows = self.conn.execute("""
+            SELECT o.name, p.n FROM tags t
+            JOIN tag_pairs p INDEXED BY tag_pairs_by_count ON p.tag_id = t.id
+            JOIN tags o ON o.id = p.other_id
+            WHERE t.name = ?
+            ORDER BY p.n DESC
+            LIMIT ?
+        """, (tag, top_n))
+        return rows.fetchall()
+
+    def tag_counts(self, start_ts: float = None, end_ts: float = None) -> Dict[str, int]:
+        """
+        统计某个时间范围内看到的视频的标签数量
+
+        同一个视频在同一天内只计一次，在多天中出现则每天各计一次。
+        统计按UTC自然日分桶，时间范围会扩展到所覆盖的整天。
+
+        Args:
+            start_ts: 起始时间戳（可选，包含）
+            end_ts: 结束时间戳（可选，不包含）
+
+        Returns:
+            Dict[str, int]: {标签: 视频·天数}
+        """
+        if start_ts is None and end_ts is None:
+            rows = self.conn.execute("""
+                SELECT t.name, c.n FROM tag_totals c
+                JOIN tags t ON t.id = c.tag_id
+            """)
+            return {name: count for name, count in rows}
+
+        start_day = -2 ** 62 if start_ts is None else math.floor(start_ts / BUCKET_SECONDS)
+        end_day = 2 ** 62 if end_ts is None else math.ceil(end_ts / BUCKET_SECONDS)
+        # 先在整数编号上聚合，最后再关联标签名
+        rows = self.conn.execute("""
+            SELECT t.name, c.n FROM (
+                SELECT tag_id, SUM(n) AS n FROM day_tag_counts
+                WHERE day >= ? AND day < ?
+                GROUP BY tag_id
+            ) c
+            JOIN tags t ON t.id = c.tag_id
+        """, (start_day, end_day))
+        return {name: count for name, count in rows}
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
@@ -3,7 +3,9 @@ import os
 import subprocess
 import time
 from dotenv import load_dotenv
-from functions.bili import BilibiliNetworkCapture, extract_text_from_json_responses, preprocess_text
+from functions.bili import BilibiliNetworkCapture, extract_text_from_json_responses, preprocess_text, count_words
+from functions.freq_store import WordFrequencyStore
+from functions.tag_index import TagIndex
 from make_cloudword import generate_wordcloud
 
 # 加载环境变量
@@ -220,7 +222,18 @@ def main():
                     
                     # 从JSON响应中提取文本
                     print("\n📝 正在从JSON响应中提取文本标签...")
-                    text_content = extract_text_from_json_responses(captured_responses)
+                    try:
+                        tag_index = TagIndex()
+                    except Exception as e:
+                        print(f"⚠️ 打开视频标签索引时出错，本次不更新索引: {e}")
+                        tag_index = None
+                    try:
+                        text_content = extract_text_from_json_responses(captured_responses, tag_index)
+                    finally:
+                        if tag_index is not None:
+                            tag_index.close()
+                    if tag_index is not None:
+                        print(f"🗂️ 视频标签索引已更新: {tag_index.db_path}")
                     
                     if text_content.strip():
                         # 预处理文本
@@ -228,6 +241,17 @@ def main():
                         processed_text = preprocess_text(text_content)
                         
                         if processed_text.strip():
+                            # 记录本次词频到滚动词频库，用于跨运行的趋势追踪
+                            try:
+                                store = WordFrequencyStore()
+                                try:
+                                    store.add_run(count_words(text_content))
+                                finally:
+                                    store.close()
+                                print(f"📊 词频已记录到: {store.db_path}")
+                            except Exception as e:
+                                print(f"⚠️ 记录词频时出错: {e}")
+                            
                             # 生成词云
                             print("\n🎨 开始生成词云图片...")
                             wordcloud_path = generate_wordcloud(processed_text)
@@ -1,7 +1,7 @@
 import os
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
-from typing import List
+from typing import Dict, List, Union
 
 
 def create_picture_directory():
@@ -25,18 +25,22 @@ def get_font_path():
     return font_file
 
 
-def generate_wordcloud(processed_text: str, output_filename: str = None) -> str:
+def generate_wordcloud(processed_text: Union[str, Dict[str, float]], output_filename: str = None) -> str:
     """
-    从预处理后的文本生成词云图片
+    从预处理后的文本或词频生成词云图片
     
     Args:
-        processed_text: 预处理后的文本内容
+        processed_text: 预处理后的文本内容，或 {词: 权重} 形式的词频
         output_filename: 输出文件名（可选）
         
     Returns:
         str: 生成的图片文件路径
     """
-    if not processed_text or not processed_text.strip():
+    if isinstance(processed_text, dict):
+        if not processed_text:
+            print("错误: 没有提供有效的词频数据")
+            return None
+    elif not processed_text or not processed_text.strip():
         print("错误: 没有提供有效的文本内容")
         return None
     
@@ -62,7 +66,10 @@ def generate_wordcloud(processed_text: str, output_filename: str = None) -> str:
         wordcloud_config['font_path'] = font_path
     
     try:
-        wordcloud = WordCloud(**wordcloud_config).generate(processed_text)
+        if isinstance(processed_text, dict):
+            wordcloud = WordCloud(**wordcloud_config).generate_from_frequencies(processed_text)
+        else:
+            wordcloud = WordCloud(**wordcloud_config).generate(processed_text)
         
         # 生成输出文件名
         if not output_filename:
@@ -92,6 +99,35 @@ def generate_wordcloud(processed_text: str, output_filename: str = None) -> str:
         return None
 
 
+def generate_window_wordcloud(store, window: str, base_window: str = None,
+                              output_filename: str = None) -> str:
+    """
+    直接从词频存储中的窗口聚合生成词云
+    
+    Args:
+        store: WordFrequencyStore 实例
+        window: 窗口名，如 'day'、'week'、'month'、'all'
+        base_window: 对比基准窗口名（可选），提供时绘制 window 相对它占比上升的词
+        output_filename: 输出文件名（可选）
+        
+    Returns:
+        str: 生成的图片文件路径
+    """
+    if base_window:
+        frequencies = store.diff_windows(window, base_window)
+        default_name = f"diff_{window}_vs_{base_window}"
+    else:
+        frequencies = store.get_window(window)
+        default_name = f"window_{window}"
+    
+    if not output_filename:
+        import datetime
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_filename = f"{default_name}_{timestamp}.png"
+    
+    return generate_wordcloud(frequencies, output_filename)
+
+
 def main():
     """测试函数"""
     # 这里可以放一些测试代码
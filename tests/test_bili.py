@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+for module in ('jieba', 'bs4', 'requests', 'tqdm'):
+    pytest.importorskip(module)
+
+from functions import bili
+from functions.tag_index import BUCKET_SECONDS, TagIndex
+
+DAY = BUCKET_SECONDS
+NOW = 1000 * DAY + 3600
+
+PAGES = {
+    'https://www.bilibili.com/video/BV1': ['游戏', '攻略'],
+    'https://www.bilibili.com/video/BV2': ['音乐'],
+}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def rcmd_response(uris):
+    """构造推荐接口的JSON响应"""
+    return json.dumps({'data': {'item': [{'uri': uri} for uri in uris]}})
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """拦截页面请求和等待，返回被请求过的链接列表"""
+    urls = []
+
+    def fake_get(url, headers=None):
+        urls.append(url)
+        return FakeResponse(url)
+
+    monkeypatch.setattr(bili.requests, 'get', fake_get)
+    monkeypatch.setattr(bili.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(bili.time, 'time', lambda: NOW)
+    monkeypatch.setattr(bili, 'parse_html_to_tag', lambda html: list(PAGES.get(html, [])))
+    return urls
+
+
+@pytest.fixture
+def index(tmp_path):
+    tag_index = TagIndex(str(tmp_path / 'tags.db'))
+    yield tag_index
+    tag_index.close()
+
+
+def test_known_videos_are_not_fetched_again(fetched, index, monkeypatch):
+    responses = [rcmd_response(PAGES)]
+    first = bili.extract_text_from_json_responses(responses, index)
+    assert fetched == list(PAGES)
+    assert index.tag_counts() == {'游戏': 1, '攻略': 1, '音乐': 1}
+
+    # 第二天再次运行：不再请求页面，但记录了新的一次看到
+    monkeypatch.setattr(bili.time, 'time', lambda: NOW + DAY)
+    fetched.clear()
+    second = bili.extract_text_from_json_responses(responses, index)
+    assert fetched == []
+    assert second == first
+    assert index.tag_counts(NOW + DAY, NOW + 2 * DAY) == {'游戏': 1, '攻略': 1, '音乐': 1}
+
+
+def test_empty_stored_tags_are_fetched_again(fetched, index):
+    uri = 'https://www.bilibili.com/video/BV1'
+    index.add_video(uri, [], ts=NOW - 3600)
+
+    text = bili.extract_text_from_json_responses([rcmd_response([uri])], index)
+    assert fetched == [uri]
+    assert text == '游戏 攻略'
+    assert sorted(index.get_tags(uri)) == ['攻略', '游戏']
+
+
+def test_stale_tags_are_refreshed(fetched, index):
+    uri = 'https://www.bilibili.com/video/BV1'
+    index.add_video(uri, ['旧标签'], ts=NOW - 8 * DAY)
+
+    text = bili.extract_text_from_json_responses([rcmd_response([uri])], index, tag_max_age=7 * DAY)
+    assert fetched == [uri]
+    assert text == '游戏 攻略'
+    assert sorted(index.get_tags(uri)) == ['攻略', '游戏']
+
+
+def test_tag_reuse_can_be_disabled(fetched, index):
+    uri = 'https://www.bilibili.com/video/BV2'
+    index.add_video(uri, ['音乐'], ts=NOW)
+
+    bili.extract_text_from_json_responses([rcmd_response([uri])], index, tag_max_age=0)
+    assert fetched == [uri]
+
+
+def test_index_errors_do_not_abort_extraction(fetched, tmp_path):
+    broken_index = TagIndex(str(tmp_path / 'tags.db'))
+    broken_index.close()
+
+    text = bili.extract_text_from_json_responses([rcmd_response(PAGES)], broken_index)
+    assert fetched == list(PAGES)
+    assert text == '游戏 攻略 音乐'
@@ -0,0 +1,110 @@
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from functions.freq_store import DEFAULT_WINDOWS, WordFrequencyStore
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+def recompute(runs, span, now):
+    """按定义从全部运行重新计算窗口词频"""
+    total = Counter()
+    for ts, counts in runs:
+        if span is None or ts >= now - span:
+            total.update(counts)
+    return dict(total)
+
+
+def test_windows_match_recomputed_history(tmp_path):
+    rng = random.Random(0)
+    store = WordFrequencyStore(str(tmp_path / 'freq.db'))
+    now = time.time()
+    runs = []
+    # 运行时间取整点后半小时，远离窗口边界
+    for hours_ago in sorted(rng.sample(range(1, 45 * 24), 60), reverse=True):
+        ts = now - hours_ago * HOUR - HOUR / 2
+        counts = {f'w{rng.randint(0, 40)}': rng.randint(1, 5) for _ in range(rng.randint(1, 15))}
+        store.add_run(counts, ts)
+        runs.append((ts, counts))
+
+        for name, span in DEFAULT_WINDOWS.items():
+            assert store.get_window(name) == recompute(runs, span, time.time())
+    store.close()
+
+
+def test_window_expires_on_read(tmp_path):
+    store = WordFrequencyStore(str(tmp_path / 'freq.db'))
+    store.add_run({'旧': 3}, time.time() - 2 * DAY)
+    assert store.get_window('day') == {}
+    assert store.get_window('week') == {'旧': 3}
+    store.close()
+
+
+def test_large_run_expires_quickly(tmp_path):
+    store = WordFrequencyStore(str(tmp_path / 'freq.db'))
+    now = time.time()
+    store.add_run({f'w{i}': 1 for i in range(20000)}, now - 3 * DAY)
+    start = time.time()
+    store.add_run({'x': 1}, now)
+    assert time.time() - start < 5
+    assert store.get_window('day') == {'x': 1}
+    assert len(store.get_window('week')) == 20001
+    store.close()
+
+
+def test_windows_kept_up_to_date_by_other_instances(tmp_path):
+    db_path = str(tmp_path / 'freq.db')
+    now = time.time()
+    store = WordFrequencyStore(db_path)
+    store.add_run({'a': 1}, now - 100)
+    store.close()
+
+    store = WordFrequencyStore(db_path, windows={'day': DAY})
+    store.add_run({'b': 2}, now - 50)
+    store.close()
+
+    store = WordFrequencyStore(db_path)
+    assert store.get_window('week') == {'a': 1, 'b': 2}
+    assert store.get_window('all') == {'a': 1, 'b': 2}
+    store.close()
+
+
+def test_diff_windows_keeps_rising_words(tmp_path):
+    store = WordFrequencyStore(str(tmp_path / 'freq.db'))
+    now = time.time()
+    store.add_run({'a': 3, 'b': 1}, now - 5 * DAY)
+    store.add_run({'b': 3, 'c': 1}, now - HOUR)
+    # day: b=0.75, c=0.25；month: a=3/8, b=4/8, c=1/8
+    diff = store.diff_windows('day', 'month')
+    assert set(diff) == {'b', 'c'}
+    assert abs(diff['b'] - 0.25) < 1e-9
+    assert abs(diff['c'] - 0.125) < 1e-9
+    store.close()
+
+
+def test_add_run_rejects_out_of_order_timestamp(tmp_path):
+    store = WordFrequencyStore(str(tmp_path / 'freq.db'))
+    now = time.time()
+    store.add_run({'a': 1}, now)
+    with pytest.raises(ValueError):
+        store.add_run({'b': 1}, now - 1)
+    store.close()
+
+
+def test_conflicting_window_span_is_rejected(tmp_path):
+    db_path = str(tmp_path / 'freq.db')
+    now = time.time()
+    store = WordFrequencyStore(db_path)
+    store.add_run({'a': 1}, now - 2 * HOUR)
+    store.close()
+
+    with pytest.raises(ValueError):
+        WordFrequencyStore(db_path, windows={'day': HOUR})
+
+    store = WordFrequencyStore(db_path)
+    assert store.get_window('day') == {'a': 1}
+    store.close()
@@ -0,0 +1,61 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip('wordcloud')
+
+import make_cloudword
+from functions.freq_store import WordFrequencyStore
+from make_cloudword import generate_wordcloud, generate_window_wordcloud
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def picture_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(make_cloudword, 'create_picture_directory', lambda: str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def store(tmp_path):
+    freq_store = WordFrequencyStore(str(tmp_path / 'freq.db'))
+    now = time.time()
+    freq_store.add_run({'game': 5, 'music': 3, 'tech': 1}, now - 5 * DAY)
+    freq_store.add_run({'music': 4, 'anime': 2}, now - 3600)
+    yield freq_store
+    freq_store.close()
+
+
+def assert_png(path, picture_dir):
+    assert path is not None
+    assert os.path.dirname(path) == str(picture_dir)
+    with open(path, 'rb') as f:
+        assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+
+
+def test_window_wordcloud_writes_png(picture_dir, store):
+    path = generate_window_wordcloud(store, 'week', output_filename='week.png')
+    assert_png(path, picture_dir)
+
+
+def test_window_diff_wordcloud_writes_png(picture_dir, store):
+    assert store.diff_windows('day', 'month')
+    path = generate_window_wordcloud(store, 'day', base_window='month')
+    assert_png(path, picture_dir)
+    assert os.path.basename(path).startswith('diff_day_vs_month_')
+
+
+def test_frequency_dict_wordcloud_writes_png(picture_dir):
+    path = generate_wordcloud({'game': 2.0, 'music': 0.5}, 'freq')
+    assert_png(path, picture_dir)
+    assert path.endswith('freq.png')
+
+
+def test_empty_frequency_dict_returns_none(picture_dir, tmp_path):
+    empty_store = WordFrequencyStore(str(tmp_path / 'empty.db'))
+    assert generate_wordcloud({}) is None
+    assert generate_window_wordcloud(empty_store, 'day') is None
+    empty_store.close()
+    assert not any(name.endswith('.png') for name in os.listdir(picture_dir))
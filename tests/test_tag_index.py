@@ -0,0 +1,120 @@
+import random
+from collections import Counter
+
+import pytest
+
+from functions.tag_index import BUCKET_SECONDS, TagIndex
+
+DAY = BUCKET_SECONDS
+
+
+@pytest.fixture
+def index(tmp_path):
+    tag_index = TagIndex(str(tmp_path / 'tags.db'))
+    yield tag_index
+    tag_index.close()
+
+
+def test_round_trip_matches_brute_force(index):
+    rng = random.Random(0)
+    videos = {}
+    seen_days = set()
+    for i in range(300):
+        uri = f'https://www.bilibili.com/video/BV{i}'
+        tags = sorted({f't{rng.randint(0, 30)}' for _ in range(rng.randint(0, 6))})
+        ts = i * DAY / 10
+        index.add_video(uri, tags, ts=ts)
+        videos[uri] = tags
+        seen_days.add((uri, int(ts // DAY)))
+    # 在之后的日期重新索引部分视频，旧标签应被完全替换，之前各天的统计也要随之修正
+    for i in range(0, 300, 7):
+        uri = f'https://www.bilibili.com/video/BV{i}'
+        tags = sorted({f't{rng.randint(0, 30)}' for _ in range(rng.randint(0, 6))})
+        ts = (i + rng.randint(0, 40)) * DAY / 10
+        index.add_video(uri, tags, ts=ts)
+        videos[uri] = tags
+        seen_days.add((uri, int(ts // DAY)))
+
+    for uri, tags in videos.items():
+        assert sorted(index.get_tags(uri)) == tags
+
+    for tag in {f't{n}' for n in range(31)}:
+        expected = {uri for uri, tags in videos.items() if tag in tags}
+        assert set(index.videos_with_tag(tag)) == expected
+
+        co = Counter(other for tags in videos.values() if tag in tags for other in tags if other != tag)
+        result = index.co_occurring_tags(tag, top_n=1000)
+        assert dict(result) == dict(co)
+        counts = [n for _, n in result]
+        assert counts == sorted(counts, reverse=True)
+
+    def brute_force_counts(start_day, end_day):
+        return dict(Counter(tag for uri, day in seen_days if start_day <= day < end_day
+                            for tag in videos[uri]))
+
+    assert index.tag_counts() == brute_force_counts(-1, 10 ** 6)
+    assert index.tag_counts(10 * DAY, 20 * DAY) == brute_force_counts(10, 20)
+    # 不对齐整天的范围扩展到所覆盖的整天
+    assert index.tag_counts(10.5 * DAY, 19.5 * DAY) == brute_force_counts(10, 20)
+    assert index.tag_counts(start_ts=25 * DAY) == brute_force_counts(25, 10 ** 6)
+    assert index.tag_counts(end_ts=5 * DAY) == brute_force_counts(-1, 5)
+
+
+def test_tag_counts_counts_each_video_once_per_day(index):
+    index.add_video('v1', ['a', 'b'], ts=10)
+    assert index.record_sighting('v1', ts=20)
+    assert not index.record_sighting('missing', ts=20)
+    assert index.tag_counts() == {'a': 1, 'b': 1}
+    assert index.tag_counts(0, DAY) == {'a': 1, 'b': 1}
+
+    assert index.record_sighting('v1', ts=DAY + 10)
+    assert index.tag_counts() == {'a': 2, 'b': 2}
+    assert index.tag_counts(DAY, 2 * DAY) == {'a': 1, 'b': 1}
+    assert index.tag_counts(2 * DAY) == {}
+
+
+def test_reindexing_removes_stale_counts(index):
+    index.add_video('v1', ['a', 'b'], ts=10)
+    index.add_video('v2', ['a', 'b'], ts=10)
+    index.add_video('v1', ['a', 'c'], ts=20)
+    assert sorted(index.co_occurring_tags('a')) == [('b', 1), ('c', 1)]
+    assert index.co_occurring_tags('b') == [('a', 1)]
+    assert index.tag_counts() == {'a': 2, 'b': 1, 'c': 1}
+
+    index.add_video('v2', [], ts=30)
+    assert index.co_occurring_tags('b') == []
+    assert index.tag_counts() == {'a': 1, 'c': 1}
+
+
+def test_sees_tags_written_by_other_instances(tmp_path):
+    db_path = str(tmp_path / 'tags.db')
+    reader = TagIndex(db_path)
+    writer = TagIndex(db_path)
+    writer.add_video('v1', ['x', 'y'], ts=1)
+    assert reader.videos_with_tag('x') == ['v1']
+    assert reader.co_occurring_tags('x') == [('y', 1)]
+    assert reader.tag_counts() == {'x': 1, 'y': 1}
+    reader.close()
+    writer.close()
+
+
+def test_rolled_back_tags_are_not_reused(index):
+    def failing_tags():
+        yield 'p'
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        index.add_video('v1', failing_tags(), ts=1)
+    index.add_video('v2', ['q'], ts=2)
+    assert index.videos_with_tag('p') == []
+    assert index.videos_with_tag('q') == ['v2']
+    assert not index.has_video('v1')
+
+
+def test_get_fresh_tags_respects_max_age(index):
+    index.add_video('v1', ['a'], ts=100)
+    assert index.get_fresh_tags('v1', max_age=50, now=140) == ['a']
+    assert index.get_fresh_tags('v1', max_age=50, now=160) == []
+    index.add_video('v1', ['b'], ts=160)
+    assert index.get_fresh_tags('v1', max_age=50, now=160) == ['b']
+    assert index.get_fresh_tags('missing', max_age=50, now=160) == []